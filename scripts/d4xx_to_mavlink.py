@@ -11,9 +11,7 @@
 #   pip3 install pyrealsense2
 #   pip3 install transformations
 #   pip3 install dronekit
-#   pip3 install apscheduler
 #   pip3 install pyserial
-#   pip3 install numba
 #   pip3 install opencv-python
 # Only necessary if you installed the minimal version of Ubuntu:
 #   sudo apt install python3-opencv
@@ -36,11 +34,12 @@ import time
 import argparse
 import threading
 import json
+import queue
+import logging
+import asyncio
 from time import sleep
-from apscheduler.schedulers.background import BackgroundScheduler
 from dronekit import connect, VehicleMode
 from pymavlink import mavutil
-from numba import njit
 
 # In order to import cv2 under python3 when you also have ROS Kinetic installed
 import os
@@ -50,6 +49,13 @@ if os.path.exists("~/anaconda3/lib/python3.7/site-packages"):
     sys.path.append('~/anaconda3/lib/python3.7/site-packages')
 import cv2
 
+# Optional Cython implementation of the band reduction (see depth_reduce.pyx).
+# Build with: python3 setup_depth_reduce.py build_ext --inplace
+try:
+    from depth_reduce import reduce_band
+except ImportError:
+    reduce_band = None
+
 ######################################################
 ##  Depth parameters - reconfigurable               ##
 ######################################################
@@ -62,20 +68,45 @@ HEIGHT      = 480              # Defines the number of lines for each frame or z
 FPS         = 30               # Defines the rate of frames per second
 DEPTH_RANGE = [0.1, 8.0]       # Replace with your sensor's specifics, in meter
 
+# Height (in pixels) of the band, centered vertically, that is reduced into the distances
+# array. A band is less noise-prone than sampling a single pixel per ray.
+DEPTH_BAND_HEIGHT = 16
+
 USE_PRESET_FILE = True
 PRESET_FILE  = "../cfg/d4xx-default.json"
 
-# List of filters to be applied, in this order.
+# Filters to be applied, in this order.
 # https://github.com/IntelRealSense/librealsense/blob/master/doc/post-processing-filters.md
-filters = [
-    [True, "Decimation Filter",     rs.decimation_filter()],
-    [True, "Threshold Filter",      rs.threshold_filter()],
-    [True, "Depth to Disparity",    rs.disparity_transform(True)],
-    [True, "Spatial Filter",        rs.spatial_filter()],
-    [True, "Temporal Filter",       rs.temporal_filter()],
-    [False, "Hole Filling Filter",   rs.hole_filling_filter()],
-    [True, "Disparity to Depth",    rs.disparity_transform(False)]
-]
+# Kept as parallel tuples (structure-of-arrays) so each consumer only touches the column
+# it needs: the startup banner reads the flags and names, while the frame loop reads
+# nothing but the prebuilt process callables below.
+FILTER_ENABLED = (
+    True,   # Decimation Filter
+    True,   # Threshold Filter
+    True,   # Depth to Disparity
+    True,   # Spatial Filter
+    True,   # Temporal Filter
+    False,  # Hole Filling Filter
+    True,   # Disparity to Depth
+)
+FILTER_NAMES = (
+    "Decimation Filter",
+    "Threshold Filter",
+    "Depth to Disparity",
+    "Spatial Filter",
+    "Temporal Filter",
+    "Hole Filling Filter",
+    "Disparity to Depth",
+)
+FILTER_OBJECTS = (
+    rs.decimation_filter(),
+    rs.threshold_filter(),
+    rs.disparity_transform(True),
+    rs.spatial_filter(),
+    rs.temporal_filter(),
+    rs.hole_filling_filter(),
+    rs.disparity_transform(False),
+)
 
 ######################################################
 ##  ArduPilot-related parameters - reconfigurable   ##
@@ -107,6 +138,11 @@ debug_enable_default = 0
 vehicle = None
 is_vehicle_connected = False
 
+# Bound MAVLink methods, cached once after connecting so the hot send path skips
+# the vehicle.message_factory attribute chain on every call (see vehicle_connect)
+obstacle_distance_encode = None
+send_mavlink = None
+
 # Camera-related variables
 pipe = None
 depth_scale = 0
@@ -115,19 +151,46 @@ colorizer = rs.colorizer()
 # The name of the display window
 display_name  = 'Input/output depth'
 
+# Single-slot handoff of (depth_frame, filtered_frame) to the display thread.
+# The newest frame wins: the main loop never blocks on the rendering.
+debug_q = queue.Queue(maxsize=1)
+
 # Data variables
 data = None
 current_time_us = 0
 
+# Timestamps follow the "time since system boot" convention of MAVLink. monotonic_ns
+# returns an int directly, with no float multiply + round on the per-frame path.
+monotonic_ns = time.monotonic_ns
+
 # Obstacle distances in front of the sensor, starting from the left in increment degrees to the right
 # See here: https://mavlink.io/en/messages/common.html#OBSTACLE_DISTANCE
 min_depth_cm = int(DEPTH_RANGE[0] * 100)  # In cm
 max_depth_cm = int(DEPTH_RANGE[1] * 100)  # In cm, should be a little conservative
+
+# The quantized distances hold at most 254 buckets of 4 cm (0xFF is the unknown
+# sentinel); readings beyond that saturate at the largest bucket instead of wrapping
+if max_depth_cm > 254 * 4:
+    print("WARNING: DEPTH_RANGE max of %d cm exceeds the quantized range; obstacles beyond %d cm will be reported at %d cm" % (max_depth_cm, 254 * 4, 254 * 4))
 distances_array_length = 72
 angle_offset = 0
 increment_f  = 0
 distances = np.ones((distances_array_length,), dtype=np.uint16) * (max_depth_cm + 1)
 
+# Internal form of the distances, quantized to 4 cm buckets (0xFF = unknown). Onboard
+# consumers read this uint8 array - half the bytes of the uint16 one - and it is only
+# expanded back to uint16 cm when the MAVLink message is encoded.
+distances_quant = np.ones((distances_array_length,), dtype=np.uint8) * 255
+
+# Reduction layout for the distances array, specialized once per depth-image shape
+# (see compute_reduction_layout): the horizontal binning and the vertical band bounds
+layout_shape = None
+bin_width = 0
+cropped_width = 0
+crop_left = 0
+band_top = 0
+band_bottom = 0
+
 ######################################################
 ##  Parsing user' inputs                            ##
 ######################################################
@@ -169,11 +232,15 @@ else:
     print("INFO: Using obstacle_distance_msg_hz", obstacle_distance_msg_hz)
 
 # The list of filters to be applied on the depth image
-for i in range(len(filters)):
-    if filters[i][0] is True:
-        print("INFO: Applying: ", filters[i][1])
+for enabled, name in zip(FILTER_ENABLED, FILTER_NAMES):
+    if enabled is True:
+        print("INFO: Applying: ", name)
     else:
-        print("INFO: NOT applying: ", filters[i][1])
+        print("INFO: NOT applying: ", name)
+
+# Bound process methods of the enabled filters, resolved once so the per-frame
+# dispatch is a plain loop over callables with no indexing or enabled checks
+active_filter_procs = tuple(f.process for f, enabled in zip(FILTER_OBJECTS, FILTER_ENABLED) if enabled)
 
 if not debug_enable:
     debug_enable = debug_enable_default
@@ -183,6 +250,13 @@ if debug_enable == 1:
 else:
     print("INFO: Debugging option DISABLED")
 
+# Hot-path diagnostics go through a logger guarded by isEnabledFor: when the level is
+# off, the guard costs one attribute access and an integer compare, instead of the
+# stdout lock and string formatting that a print would always pay
+logging.basicConfig(format = '%(levelname)s: %(message)s')
+log = logging.getLogger('d4xx_to_mavlink')
+log.setLevel(logging.DEBUG if debug_enable == 1 else logging.INFO)
+
 ######################################################
 ##  Functions - MAVLink                             ##
 ######################################################
@@ -193,7 +267,13 @@ def send_obstacle_distance_message():
     if angle_offset == 0 or increment_f == 0:
         print("Please call set_obstacle_distance_params before continue")
     else:
-        msg = vehicle.message_factory.obstacle_distance_encode(
+        # Expand the quantized distances (4 cm buckets) back into the uint16 cm array
+        # that the message requires; the 0xFF unknown sentinel maps back to UINT16_MAX
+        np.copyto(distances, distances_quant, casting = 'unsafe')
+        distances <<= 2
+        distances[distances_quant == 255] = 65535
+
+        msg = obstacle_distance_encode(
             current_time_us,    # us Timestamp (UNIX time or time since system boot)
             0,                  # sensor_type, defined here: https://mavlink.io/en/messages/common.html#MAV_DISTANCE_SENSOR
             distances,          # distances,    uint16_t[72],   cm
@@ -202,18 +282,25 @@ def send_obstacle_distance_message():
             max_depth_cm,       # max_distance, uint16_t,       cm
             increment_f,	    # increment_f,  float,          deg
             angle_offset,       # angle_offset, float,          deg
-            12                  # MAV_FRAME, vehicle-front aligned: https://mavlink.io/en/messages/common.html#MAV_FRAME_BODY_FRD    
+            12                  # MAV_FRAME, vehicle-front aligned: https://mavlink.io/en/messages/common.html#MAV_FRAME_BODY_FRD
         )
 
-        vehicle.send_mavlink(msg)
-        vehicle.flush()
+        send_mavlink(msg)
 
 # https://mavlink.io/en/messages/common.html#DISTANCE_SENSOR
 # To-do: Possible extension for individual object detection
 def send_distance_sensor_message():
-    global current_time, distances
-    # Average out a portion of the centermost part
-    curr_dist = int(np.mean(distances[33:38]))
+    global current_time, distances_quant
+    # Average out a portion of the centermost part, in the quantized (4 cm) form.
+    # Unknown (0xFF) bins are excluded: averaged in, the sentinel would only weigh
+    # 1020 cm and dilute into a plausible but wrong in-range reading. When no center
+    # bin is valid, send an out-of-range value so the FCU rejects it.
+    center_bins = distances_quant[33:38]
+    valid_bins = center_bins[center_bins != 255]
+    if valid_bins.size == 0:
+        curr_dist = 65535
+    else:
+        curr_dist = int(np.mean(valid_bins)) << 2
     msg = vehicle.message_factory.distance_sensor_encode(
         0,              # us Timestamp (UNIX time or time since system boot) (ignored)
         min_depth_cm,   # min_distance, uint16_t, cm
@@ -226,7 +313,6 @@ def send_distance_sensor_message():
     )
 
     vehicle.send_mavlink(msg)
-    vehicle.flush()
 
 def send_msg_to_gcs(text_to_be_sent):
     # MAV_SEVERITY: 0=EMERGENCY 1=ALERT 2=CRITICAL 3=ERROR, 4=WARNING, 5=NOTICE, 6=INFO, 7=DEBUG, 8=ENUM_END
@@ -239,7 +325,6 @@ def send_msg_to_gcs(text_to_be_sent):
             text_msg.encode()	    # max size is char[50]       
         )
         vehicle.send_mavlink(status_msg)
-        vehicle.flush()
         print("INFO: " + text_to_be_sent)
     else:
         print("INFO: Vehicle not connected. Cannot send text message to Ground Control Station (GCS)")
@@ -248,13 +333,12 @@ def send_msg_to_gcs(text_to_be_sent):
 # TODO: Inspect the usage of timesync_update 
 def update_timesync(ts=0, tc=0):
     if ts == 0:
-        ts = int(round(time.time() * 1000))
+        ts = monotonic_ns() // 1000000
     msg = vehicle.message_factory.timesync_encode(
         tc,     # tc1
         ts      # ts1
     )
     vehicle.send_mavlink(msg)
-    vehicle.flush()
 
 # Listen to attitude data to acquire heading when compass data is enabled
 def att_msg_callback(self, attr_name, value):
@@ -268,19 +352,21 @@ def att_msg_callback(self, attr_name, value):
 
 # Establish connection to the FCU
 def vehicle_connect():
-    global vehicle, is_vehicle_connected
-    
+    global vehicle, is_vehicle_connected, obstacle_distance_encode, send_mavlink
+
     try:
         vehicle = connect(connection_string, wait_ready = True, baud = connection_baudrate, source_system = 1)
     except:
         print('Connection error! Retrying...')
-        sleep(1)
 
     if vehicle == None:
         is_vehicle_connected = False
         return False
     else:
         is_vehicle_connected = True
+        # Cache the bound methods used at the message rate
+        obstacle_distance_encode = vehicle.message_factory.obstacle_distance_encode
+        send_mavlink = vehicle.send_mavlink
         return True
 
 ######################################################
@@ -354,6 +440,9 @@ def realsense_connect():
     depth_scale = depth_sensor.get_depth_scale()
     print("INFO: Depth scale is: ", depth_scale)
 
+    # Precompute the reduction layout for the unfiltered image shape
+    compute_reduction_layout(HEIGHT, WIDTH)
+
 def realsense_configure_setting(setting_file):
     device = find_device_that_supports_advanced_mode()
     advnc_mode = rs.rs400_advanced_mode(device)
@@ -372,53 +461,127 @@ def set_obstacle_distance_params():
     # For forward facing camera with a horizontal wide view:
     # HFOV=2*atan[w/(2.fx)], VFOV=2*atan[h/(2.fy)], DFOV=2*atan(Diag/2*f), Diag=sqrt(w^2 + h^2)
     HFOV = m.degrees(2 * m.atan(WIDTH / (2 * depth_intrinsics.fx)))
-    angle_offset = camera_facing_angle_degree - (HFOV / 2) 
-    increment_f  =  HFOV / distances_array_length
-    print("INFO: Depth camera HFOV: %0.2f degrees" % HFOV)
+
+    # The reduction crops the image symmetrically to a multiple of the array length
+    # (see compute_reduction_layout), so the bins only span the covered part of the FOV
+    covered_HFOV = HFOV * cropped_width / WIDTH
+    angle_offset = camera_facing_angle_degree - (covered_HFOV / 2)
+    increment_f  = covered_HFOV / distances_array_length
+    print("INFO: Depth camera HFOV: %0.2f degrees, covered by the distances array: %0.2f degrees" % (HFOV, covered_HFOV))
 
 # Calculate the distances array by dividing the FOV (horizontal) into $distances_array_length rays,
-# then pick out the depth value at the pixel corresponding to each ray. Based on the definition of
-# the MAVLink messages, the invalid distance value (below MIN/above MAX) will be replaced with MAX+1.
-#    
+# then reduce the band of pixels corresponding to each ray to the closest valid (non-zero) depth.
+# Based on the definition of the MAVLink messages, the invalid distance value (below MIN/above MAX)
+# will be replaced with MAX+1.
+#
 # [0]    [35]   [71]    <- Output: distances[72]
 #  |      |      |      <- step = width / 72
-#  ---------------      <- horizontal line, or height/2
+#  ===============      <- horizontal band of DEPTH_BAND_HEIGHT rows, centered on height/2
 #  \      |      /
 #   \     |     /
 #    \    |    /
 #     \   |   /
 #      \  |  /
-#       \ | /           
+#       \ | /
 #       Camera          <- Input: depth_mat, obtained from depth image
 #
-# Note that we assume the input depth_mat is already processed by at least hole-filling filter.
-# Otherwise, the output array might not be stable from frame to frame.
-@njit
-def distances_from_depth_image(depth_mat, distances, min_depth_m, max_depth_m):
-    depth_img_width  = depth_mat.shape[1]
-    depth_img_height = depth_mat.shape[0]
-    step = depth_img_width / distances_array_length
-
-    for i in range(distances_array_length):
-        # Converting depth from uint16_t unit to metric unit. depth_scale is usually 1mm following ROS convention.
-        dist_m = depth_mat[int(depth_img_height/2), int(i * step)] * depth_scale
-
-        # Default value, unless overwritten: 
-        #   A value of max_distance + 1 (cm) means no obstacle is present. 
-        #   A value of UINT16_MAX (65535) for unknown/not used.
-        distances[i] = 65535
-
-        # Note that dist_m is in meter, while distances[] is in cm.
-        if dist_m > min_depth_m and dist_m < max_depth_m:
-            distances[i] = dist_m * 100
+# Note that the input depth_mat does not need to be filtered beforehand: invalid (zero)
+# pixels are excluded from the per-bin minimum, so stray holes do not destabilize the output.
+def compute_reduction_layout(depth_img_height, depth_img_width):
+    global layout_shape, bin_width, cropped_width, crop_left, band_top, band_bottom
+    bin_width = depth_img_width // distances_array_length
+    # Crop the width to a multiple of the array length so that the band reshapes evenly
+    # into bins. The crop is centered so the bins stay symmetric around the optical axis;
+    # set_obstacle_distance_params scales the reported FOV down to the covered columns.
+    cropped_width = bin_width * distances_array_length
+    crop_left = (depth_img_width - cropped_width) // 2
+    band_height = min(DEPTH_BAND_HEIGHT, depth_img_height)
+    band_top = (depth_img_height - band_height) // 2
+    band_bottom = band_top + band_height
+    layout_shape = (depth_img_height, depth_img_width)
+
+def distances_from_depth_image(depth_mat, distances_quant, min_depth_m, max_depth_m, depth_scale):
+    # Every shape-dependent constant (binning, band bounds) is specialized once per
+    # depth-image shape; the steady state only pays a single tuple compare per frame
+    if depth_mat.shape != layout_shape:
+        compute_reduction_layout(depth_mat.shape[0], depth_mat.shape[1])
+
+    # Prefer the Cython reduction when the extension has been built; it performs the
+    # same per-bin minimum without materializing any intermediate arrays
+    if reduce_band is not None:
+        reduce_band(depth_mat, distances_quant, band_top, band_bottom, crop_left, bin_width,
+                    depth_scale, min_depth_m, max_depth_m)
+        return
+
+    # Slice out the vertical band and fold its columns into one group of pixels per ray
+    band = depth_mat[band_top : band_bottom, crop_left : crop_left + cropped_width]
+    bins = band.reshape(band_bottom - band_top, distances_array_length, bin_width)
+
+    # A raw depth of zero means no data, so exclude it from the minimum by mapping it to UINT16_MAX.
+    # Converting depth from uint16_t unit to metric unit. depth_scale is usually 1mm following ROS convention.
+    dist_m = np.where(bins == 0, np.uint16(65535), bins).min(axis=(0, 2)) * depth_scale
+
+    # Note that dist_m is in meter, while distances_quant[] is in 4 cm buckets
+    # (dist_m * 100 / 4), with 0xFF for unknown/not used. The + 0.5 rounds to the nearest
+    # bucket before the cast truncates, so a reading just above the minimum range cannot
+    # quantize to a value below min_distance and be discarded by the FCU. The clamp to
+    # 254 keeps a max_depth_m beyond the uint8 range from wrapping into the sentinel or
+    # aliasing far readings into phantom close obstacles.
+    # The range mask goes through NumPy's branchless compare/blend; copyto casts the
+    # result straight into the preallocated buffer without an intermediate uint8 array.
+    np.copyto(distances_quant, np.where((dist_m > min_depth_m) & (dist_m < max_depth_m), np.minimum(dist_m * 25 + 0.5, 254), 255), casting = 'unsafe')
+
+# Display the input and filtered depth images in a window. Runs on its own thread, fed by
+# debug_q, so the rendering (colorize, resize, putText, imshow) never delays the loop that
+# timestamps the MAVLink data.
+def debug_display_monitor():
+    last_time = time.time()
+    cv2.namedWindow(display_name, cv2.WINDOW_AUTOSIZE)
+
+    # Preallocated render targets, reused across frames so each iteration does not
+    # allocate fresh HxWx3 images for the resize and the side-by-side composition
+    resized_image = cv2.UMat(HEIGHT, WIDTH, cv2.CV_8UC3)
+    display_image = cv2.UMat(HEIGHT, WIDTH * 2, cv2.CV_8UC3)
+
+    while True:
+        depth_frame, filtered_frame = debug_q.get()
+
+        # Prepare the images. Wrapping them in UMat routes the resize/hconcat/putText
+        # pipeline through OpenCL (when available) instead of the CPU; imshow accepts
+        # UMat directly, so the result is only downloaded when it is displayed.
+        input_image = cv2.UMat(np.asanyarray(colorizer.colorize(depth_frame).get_data()))
+        output_image = cv2.UMat(np.asanyarray(colorizer.colorize(filtered_frame).get_data()))
+        cv2.resize(output_image, (WIDTH, HEIGHT), dst = resized_image)
+        cv2.hconcat([input_image, resized_image], dst = display_image)
+
+        # Put the fps in the corner of the image
+        processing_speed = 1 / (time.time() - last_time)
+        text = ("%0.2f" % (processing_speed,)) + ' fps'
+        textsize = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
+        cv2.putText(display_image,
+                    text,
+                    org = (int((WIDTH * 2 - textsize[0]/2)), int((textsize[1])/2)),
+                    fontFace = cv2.FONT_HERSHEY_SIMPLEX,
+                    fontScale = 0.5,
+                    thickness = 1,
+                    color = (255, 255, 255))
+
+        # Show the images
+        cv2.imshow(display_name, display_image)
+        cv2.waitKey(1)
+
+        last_time = time.time()
 
 ######################################################
 ##  Main code starts here                           ##
 ######################################################
 
 print("INFO: Connecting to vehicle.")
+# Retry with a bounded exponential backoff instead of spinning on the CPU
+connection_retry_delay_sec = 0.5
 while (not vehicle_connect()):
-    pass
+    time.sleep(connection_retry_delay_sec)
+    connection_retry_delay_sec = min(connection_retry_delay_sec * 2, 5.0)
 print("INFO: Vehicle connected.")
 
 send_msg_to_gcs('Connecting to camera...')
@@ -429,14 +592,22 @@ send_msg_to_gcs('Camera connected.')
 
 set_obstacle_distance_params()
 
-# Send MAVlink messages in the background at pre-determined frequencies
-sched = BackgroundScheduler()
+# Fire func every interval_sec on the event loop via a call_later chain. Running the
+# message senders on the same single-threaded loop as the frame processing removes the
+# thread wakeup and GIL handoff that a BackgroundScheduler worker pays on every job.
+# Re-arm before invoking so the period does not drift by the execution time, and keep
+# the chain alive through transient errors (e.g. a failed serial write), as the
+# BackgroundScheduler did for its jobs.
+def schedule_periodic(loop, interval_sec, func):
+    loop.call_later(interval_sec, schedule_periodic, loop, interval_sec, func)
+    try:
+        func()
+    except Exception as e:
+        print("WARNING: Periodic job", func.__name__, "failed:", e)
 
 if enable_msg_obstacle_distance:
-    sched.add_job(send_obstacle_distance_message, 'interval', seconds = 1/obstacle_distance_msg_hz)
     send_msg_to_gcs('Sending obstacle distance messages to FCU')
 elif enable_msg_distance_sensor:
-    sched.add_job(send_distance_sensor_message, 'interval', seconds = 1/obstacle_distance_msg_hz)
     send_msg_to_gcs('Sending distance sensor messages to FCU')
 else:
     send_msg_to_gcs('Nothing to do. Check params to enable something')
@@ -445,63 +616,69 @@ else:
     print("INFO: Realsense pipe and vehicle object closed.")
     sys.exit()
 
-sched.start()
+# A separate thread to display the debugging images
+if debug_enable == 1:
+    debug_display_thread = threading.Thread(target=debug_display_monitor)
+    debug_display_thread.daemon = True
+    debug_display_thread.start()
+
+# The main loop. The blocking wait_for_frames call runs in the default executor so the
+# callbacks scheduled on the loop fire on time while a frame is awaited.
+async def main_loop():
+    global current_time_us
+
+    loop = asyncio.get_running_loop()
+
+    # Send MAVlink messages at the pre-determined frequency
+    if enable_msg_obstacle_distance:
+        loop.call_later(1/obstacle_distance_msg_hz, schedule_periodic, loop, 1/obstacle_distance_msg_hz, send_obstacle_distance_message)
+    elif enable_msg_distance_sensor:
+        loop.call_later(1/obstacle_distance_msg_hz, schedule_periodic, loop, 1/obstacle_distance_msg_hz, send_distance_sensor_message)
 
-# Begin of the main loop
-last_time = time.time()
-try:
     while True:
         # This call waits until a new coherent set of frames is available on a device
         # Calls to get_frame_data(...) and get_frame_timestamp(...) on a device will return stable values until wait_for_frames(...) is called
-        frames = pipe.wait_for_frames()
+        frames = await loop.run_in_executor(None, pipe.wait_for_frames)
         depth_frame = frames.get_depth_frame()
 
         if not depth_frame:
             continue
 
         # Store the timestamp for MAVLink messages
-        current_time_us = int(round(time.time() * 1000000))
-
-        # Apply the filters
-        filtered_frame = depth_frame
-        for i in range(len(filters)):
-            if filters[i][0] is True:
-                filtered_frame = filters[i][2].process(filtered_frame)
-
-        # Extract depth in matrix form
-        depth_data = filtered_frame.as_frame().get_data()
-        depth_mat = np.asanyarray(depth_data)
+        current_time_us = monotonic_ns() // 1000
+
+        # Extract depth in matrix form. The distances array only needs the center band of
+        # the raw image, so the full-frame filter chain is skipped on this path: each filter
+        # writes a whole HxW image back to memory, while the per-bin minimum of non-zero
+        # depths already rejects the stray holes that the filters would fill.
+        # np.frombuffer wraps the frame's buffer with a guaranteed zero-copy (read-only)
+        # view, while asanyarray has to probe the buffer protocol and may shadow-copy
+        # depending on the librealsense binding version
+        depth_data = depth_frame.as_frame().get_data()
+        depth_mat = np.frombuffer(depth_data, dtype = np.uint16).reshape(depth_frame.get_height(), depth_frame.get_width())
 
         # Create obstacle distance data from depth image
-        distances_from_depth_image(depth_mat, distances, DEPTH_RANGE[0], DEPTH_RANGE[1])
+        distances_from_depth_image(depth_mat, distances_quant, DEPTH_RANGE[0], DEPTH_RANGE[1], depth_scale)
 
         if debug_enable == 1:
-            # Prepare the images
-            input_image = np.asanyarray(colorizer.colorize(depth_frame).get_data())
-            output_image = np.asanyarray(colorizer.colorize(filtered_frame).get_data())
-            display_image = np.hstack((input_image, cv2.resize(output_image, (WIDTH, HEIGHT))))
-
-            # Put the fps in the corner of the image
-            processing_speed = 1 / (time.time() - last_time)
-            text = ("%0.2f" % (processing_speed,)) + ' fps'
-            textsize = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)[0]
-            cv2.namedWindow(display_name, cv2.WINDOW_AUTOSIZE)
-            cv2.putText(display_image, 
-                        text,
-                        org = (int((display_image.shape[1] - textsize[0]/2)), int((textsize[1])/2)),
-                        fontFace = cv2.FONT_HERSHEY_SIMPLEX,
-                        fontScale = 0.5,
-                        thickness = 1,
-                        color = (255, 255, 255))
-
-            # Show the images
-            cv2.imshow(display_name, display_image)
-            cv2.waitKey(1)
-
-            # Print all the distances in a line
-            # print(*distances)
-            
-            last_time = time.time()
+            # Apply the filters, only for display purposes
+            filtered_frame = depth_frame
+            for proc in active_filter_procs:
+                filtered_frame = proc(filtered_frame)
+
+            # Hand the frames off to the display thread. If the display is still busy
+            # with the previous frame, skip this one instead of stalling.
+            try:
+                debug_q.put_nowait((depth_frame, filtered_frame))
+            except queue.Full:
+                pass
+
+            # Log all the distances in a line, in the quantized (4 cm) form
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(' '.join(map(str, distances_quant)))
+
+try:
+    asyncio.run(main_loop())
 
 except KeyboardInterrupt:
     send_msg_to_gcs('Closing the script...')  
@@ -0,0 +1,50 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+
+######################################################
+##  Cython band reduction for d4xx_to_mavlink       ##
+######################################################
+# Optional, faster implementation of the band min-reduction in
+# distances_from_depth_image. The inner loop over uint16 depths compiles to a
+# straight C loop that the compiler can vectorize (e.g. AVX2 pminuw), removing
+# the NumPy temporary arrays and per-call dispatch overhead.
+#
+# Build in place with:
+#   python3 setup_depth_reduce.py build_ext --inplace
+#
+# d4xx_to_mavlink.py falls back to the NumPy implementation when this
+# extension has not been built.
+
+cpdef void reduce_band(const unsigned short[:, ::1] depth_mat, unsigned char[::1] distances_quant,
+                       Py_ssize_t band_top, Py_ssize_t band_bottom, Py_ssize_t crop_left,
+                       Py_ssize_t bin_width, double depth_scale, double min_depth_m, double max_depth_m):
+    cdef Py_ssize_t i, x, y, col0
+    cdef unsigned short min_depth, v
+    cdef double dist_m, quant
+
+    for i in range(distances_quant.shape[0]):
+        # The bins are centered horizontally: crop_left columns on each side fall
+        # outside the covered FOV reported by set_obstacle_distance_params
+        col0 = crop_left + i * bin_width
+
+        # Minimum non-zero depth of the bin; zero means no data
+        min_depth = 65535
+        for y in range(band_top, band_bottom):
+            for x in range(col0, col0 + bin_width):
+                v = depth_mat[y, x]
+                if v != 0 and v < min_depth:
+                    min_depth = v
+
+        # Note that dist_m is in meter, while distances_quant[] is in 4 cm buckets
+        # (dist_m * 100 / 4), with 0xFF for unknown/not used. The + 0.5 rounds to the
+        # nearest bucket before the cast truncates, so a reading just above the minimum
+        # range cannot quantize to a value below min_distance and be discarded by the FCU.
+        # The clamp to 254 keeps a max_depth_m beyond the uint8 range from hitting the
+        # undefined out-of-range double-to-uint8 cast or aliasing into the sentinel.
+        dist_m = min_depth * depth_scale
+        if dist_m > min_depth_m and dist_m < max_depth_m:
+            quant = dist_m * 25.0 + 0.5
+            if quant > 254.0:
+                quant = 254.0
+            distances_quant[i] = <unsigned char>quant
+        else:
+            distances_quant[i] = 255
@@ -8,7 +8,7 @@ import sys
 import pyrealsense2 as rs           # Intel RealSense cross-platform open-source API
 import time
 import numpy as np                  # fundamental package for scientific computing
-from numba import njit              # pip install numba, or use anaconda to install
+from numba import njit, types, uint16, float64  # pip install numba, or use anaconda to install
 
 
 ######################################################
@@ -31,8 +31,12 @@ depth_scale = 0
 ##      Functions                                   ##
 ######################################################
 
-@njit
-def calculate_depth_txt_img(depth_mat):
+# The explicit signature compiles the kernel at import time instead of on the first frame,
+# and cache=True saves the compiled artifact so later runs skip the JIT entirely. nogil=True
+# releases the GIL while the image is scanned. depth_scale is passed as an argument rather
+# than captured as a global, since a captured global would be frozen into the compiled code.
+@njit(types.unicode_type(uint16[:, :], float64), nogil=True, boundscheck=False, fastmath=True, cache=True)
+def calculate_depth_txt_img(depth_mat, depth_scale):
     img_txt = ""
     coverage = [0] * ROW_LENGTH
     for y in range(HEIGHT):
@@ -43,7 +47,7 @@ def calculate_depth_txt_img(depth_mat):
             if 0 < dist and dist < MAX_DEPTH:
                 coverage[x // WIDTH_RATIO] += 1
 
-        if y % HEIGHT_RATIO is (HEIGHT_RATIO - 1):
+        if y % HEIGHT_RATIO == (HEIGHT_RATIO - 1):
             line = ""
             for c in coverage:
                 pixel_index = c // int(HEIGHT_RATIO * WIDTH_RATIO / (len(pixels) - 1))  # Magic number: c // 25
@@ -83,7 +87,7 @@ try:
         depth_array = np.asanyarray(depth_data)
         
         # Print a simple text-based representation of the image, by breaking it into WIDTH_RATIO x HEIGHT_RATIO pixel regions and approximating the coverage of pixels within MAX_DEPTH_TRUE_SCALE
-        img_txt = calculate_depth_txt_img(depth_array)
+        img_txt = calculate_depth_txt_img(depth_array, depth_scale)
         print(img_txt)
         
         # Print some debugging messages
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+
+# Build script for the optional depth_reduce Cython extension:
+#   pip3 install cython
+#   python3 setup_depth_reduce.py build_ext --inplace
+
+from setuptools import setup
+from setuptools.extension import Extension
+from Cython.Build import cythonize
+
+extensions = [
+    Extension(
+        "depth_reduce",
+        ["depth_reduce.pyx"],
+        extra_compile_args = ["-O3", "-march=native", "-ftree-vectorize", "-ffast-math"],
+    )
+]
+
+setup(name = "depth_reduce", ext_modules = cythonize(extensions))
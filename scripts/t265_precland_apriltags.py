@@ -294,7 +294,6 @@ def send_land_target_message():
             1,              # position_valid boolean
         )
         vehicle.send_mavlink(msg)
-        vehicle.flush()
 
 # https://mavlink.io/en/messages/common.html#VISION_POSITION_ESTIMATE
 def send_vision_position_message():
@@ -314,7 +313,6 @@ def send_vision_position_message():
         )
 
         vehicle.send_mavlink(msg)
-        vehicle.flush()
 
 # For a lack of a dedicated message, we pack the confidence level into a message that will not be used, so we can view it on GCS
 # Confidence level value: 0 - 3, remapped to 0 - 100: 0% - Failed / 33.3% - Low / 66.6% - Medium / 100% - High 
@@ -333,7 +331,6 @@ def send_confidence_level_dummy_message():
             float(data.tracker_confidence * 100 / 3)          
         )
         vehicle.send_mavlink(msg)
-        vehicle.flush()
 
         # If confidence level changes, send MAVLink message to show confidence level textually and phonetically
         if current_confidence is None or current_confidence != data.tracker_confidence:
@@ -344,7 +341,6 @@ def send_confidence_level_dummy_message():
                 confidence_status_string.encode()	  #text	char[50]       
             )
             vehicle.send_mavlink(status_msg)
-            vehicle.flush()
 
 # Send a mavlink SET_GPS_GLOBAL_ORIGIN message (http://mavlink.org/messages/common#SET_GPS_GLOBAL_ORIGIN), which allows us to use local position information without a GPS.
 def set_default_global_origin():
@@ -356,7 +352,6 @@ def set_default_global_origin():
     )
 
     vehicle.send_mavlink(msg)
-    vehicle.flush()
 
 # Send a mavlink SET_HOME_POSITION message (http://mavlink.org/messages/common#SET_HOME_POSITION), which allows us to use local position information without a GPS.
 def set_default_home_position():
@@ -384,7 +379,6 @@ def set_default_home_position():
     )
 
     vehicle.send_mavlink(msg)
-    vehicle.flush()
 
 # Request a timesync update from the flight controller, for future work.
 # TODO: Inspect the usage of timesync_update 
@@ -396,7 +390,6 @@ def update_timesync(ts=0, tc=0):
         ts      # ts1
     )
     vehicle.send_mavlink(msg)
-    vehicle.flush()
 
 # Listen to messages that indicate EKF is ready to set home, then set EKF home automatically.
 def statustext_callback(self, attr_name, value):
@@ -472,8 +465,11 @@ realsense_connect()
 print("INFO: Realsense connected.")
 
 print("INFO: Connecting to vehicle.")
+# Retry with a bounded exponential backoff instead of spinning on the CPU
+connection_retry_delay_sec = 0.5
 while (not vehicle_connect()):
-    pass
+    time.sleep(connection_retry_delay_sec)
+    connection_retry_delay_sec = min(connection_retry_delay_sec * 2, 5.0)
 print("INFO: Vehicle connected.")
 
 # Listen to the mavlink messages that will be used as trigger to set EKF home automatically
@@ -26,6 +26,7 @@ import math as m
 import time
 import argparse
 import threading
+import selectors
 from time import sleep
 from apscheduler.schedulers.background import BackgroundScheduler
 
@@ -262,7 +263,6 @@ def send_vision_position_estimate_message():
                 reset_counter               # Estimate reset counter. Increment every time pose estimate jumps.
             )
             vehicle.send_mavlink(msg)
-            vehicle.flush()
 
 # https://mavlink.io/en/messages/ardupilotmega.html#VISION_POSITION_DELTA
 def send_vision_position_delta_message():
@@ -286,7 +286,6 @@ def send_vision_position_delta_message():
                 current_confidence_level # Normalized confidence value from 0 to 100. 
             )
             vehicle.send_mavlink(msg)
-            vehicle.flush()
 
             # Save static variables
             send_vision_position_delta_message.H_aeroRef_PrevAeroBody = H_aeroRef_aeroBody
@@ -314,7 +313,6 @@ def send_vision_speed_estimate_message():
                 reset_counter               # Estimate reset counter. Increment every time pose estimate jumps.
             )
             vehicle.send_mavlink(msg)
-            vehicle.flush()
 
 # Update the changes of confidence level on GCS and terminal
 def update_tracking_confidence_to_gcs():
@@ -335,7 +333,6 @@ def send_msg_to_gcs(text_to_be_sent):
             text_msg.encode()	    # max size is char[50]       
         )
         vehicle.send_mavlink(status_msg)
-        vehicle.flush()
         print("INFO: " + text_to_be_sent)
     else:
         print("INFO: Vehicle not connected. Cannot send text message to Ground Control Station (GCS)")
@@ -351,7 +348,6 @@ def set_default_global_origin():
         )
 
         vehicle.send_mavlink(msg)
-        vehicle.flush()
 
 # Send a mavlink SET_HOME_POSITION message (http://mavlink.org/messages/common#SET_HOME_POSITION), which allows us to use local position information without a GPS.
 def set_default_home_position():
@@ -380,7 +376,6 @@ def set_default_home_position():
         )
 
         vehicle.send_mavlink(msg)
-        vehicle.flush()
 
 # Request a timesync update from the flight controller, for future work.
 # TODO: Inspect the usage of timesync_update 
@@ -392,7 +387,6 @@ def update_timesync(ts=0, tc=0):
         ts      # ts1
     )
     vehicle.send_mavlink(msg)
-    vehicle.flush()
 
 # Listen to attitude data to acquire heading when compass data is enabled
 def att_msg_callback(self, attr_name, value):
@@ -411,7 +405,6 @@ def vehicle_connect():
         vehicle = connect(connection_string, wait_ready = True, baud = connection_baudrate, source_system = 1)
     except:
         print('Connection error! Retrying...')
-        sleep(1)
 
     if vehicle == None:
         is_vehicle_connected = False
@@ -457,29 +450,45 @@ def realsense_connect():
 # Monitor user input from the terminal and perform action accordingly
 def user_input_monitor():
     global scale_factor
+
+    # Setting the EKF home automatically is a one-shot action: re-sending it on every
+    # iteration would spam the FCU with SET_GPS_GLOBAL_ORIGIN messages
+    if enable_auto_set_ekf_home:
+        send_msg_to_gcs('Set EKF home with default GPS location')
+        set_default_global_origin()
+        set_default_home_position()
+        time.sleep(1) # Wait a short while for FCU to start working
+
+    # Wait for stdin to become readable instead of blocking on a bare input(): when stdin
+    # is a closed pipe (e.g. running as a systemd service), readline returns EOF and the
+    # thread exits cleanly instead of spinning on IOError
+    sel = selectors.DefaultSelector()
+    sel.register(sys.stdin, selectors.EVENT_READ)
+
     while True:
         # Special case: updating scale
         if scale_calib_enable == True:
             scale_factor = float(input("INFO: Type in new scale as float number\n"))
             print("INFO: New scale is ", scale_factor)
+            continue
 
-        if enable_auto_set_ekf_home:
-            send_msg_to_gcs('Set EKF home with default GPS location')
-            set_default_global_origin()
-            set_default_home_position()
-            time.sleep(1) # Wait a short while for FCU to start working
+        if not sel.select(timeout = 1.0):
+            continue
+
+        c = sys.stdin.readline()
+        if c == "":
+            print("INFO: stdin closed. Stopping user input monitor.")
+            return
 
         # Add new action here according to the key pressed.
         # Enter: Set EKF home when user press enter
-        try:
-            c = input()
-            if c == "":
-                send_msg_to_gcs('Set EKF home with default GPS location')
-                set_default_global_origin()
-                set_default_home_position()
-            else:
-                print("Got keyboard input", c)
-        except IOError: pass
+        c = c.rstrip("\n")
+        if c == "":
+            send_msg_to_gcs('Set EKF home with default GPS location')
+            set_default_global_origin()
+            set_default_home_position()
+        else:
+            print("Got keyboard input", c)
 
 
 #######################################
@@ -487,8 +496,11 @@ def user_input_monitor():
 #######################################
 
 print("INFO: Connecting to vehicle.")
+# Retry with a bounded exponential backoff instead of spinning on the CPU
+connection_retry_delay_sec = 0.5
 while (not vehicle_connect()):
-    pass
+    time.sleep(connection_retry_delay_sec)
+    connection_retry_delay_sec = min(connection_retry_delay_sec * 2, 5.0)
 print("INFO: Vehicle connected.")
 
 send_msg_to_gcs('Connecting to camera...')